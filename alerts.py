@@ -4,33 +4,35 @@ from email.mime.multipart import MIMEMultipart
 import sqlite3
 from dotenv import load_dotenv
 import os
+from datetime import datetime, timedelta, timezone
+from retention import query_findings
+from scoring import rank_rows
 
 load_dotenv()
 
 DB_NAME = "darkweb_data.db"
+# The digest covers findings from the last DIGEST_DAYS, best DIGEST_SIZE first
+DIGEST_DAYS = 7
+DIGEST_SIZE = 100
 
-def fetch_data_from_db():
-    """Retrieve all scraped data from the SQLite database."""
+def fetch_data_from_db(days=DIGEST_DAYS):
+    """Retrieve scraped data from the last ``days`` days."""
+    start = (datetime.now(timezone.utc) - timedelta(days=days)).strftime("%Y-%m-%d")
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM scraped_data")
-        rows = cursor.fetchall()
-        conn.close()
-        return rows
+        return query_findings(start=start)
     except sqlite3.Error as e:
         print(f"Database error: {e}")
         return []
 
 def format_data_as_html(data):
-    """Format database data as an HTML table."""
+    """Format ranked (score, row) pairs as an HTML table."""
     if not data:
         return "<html><body><h2>No data available to display.</h2></body></html>"
     
     html = "<html><body><h2>Scraped Dark Web Data</h2><table border='1'>"
-    html += "<tr><th>ID</th><th>URL</th><th>Keywords</th><th>Sentiment</th><th>Snippet</th></tr>"
-    for row in data:
-        html += f"<tr><td>{row[0]}</td><td>{row[1]}</td><td>{row[2]}</td><td>{row[3]}</td><td>{row[4]}</td></tr>"
+    html += "<tr><th>ID</th><th>URL</th><th>Keywords</th><th>Sentiment</th><th>Score</th><th>Snippet</th></tr>"
+    for score, row in data:
+        html += f"<tr><td>{row[0]}</td><td>{row[1]}</td><td>{row[2]}</td><td>{row[3]}</td><td>{score:.3f}</td><td>{row[4]}</td></tr>"
     html += "</table></body></html>"
     return html
 
@@ -48,7 +50,8 @@ def send_email(to_email):
         print("No data to send.")
         return
 
-    html_content = format_data_as_html(data)
+    # Highest threat score first
+    html_content = format_data_as_html(rank_rows(data, k=DIGEST_SIZE))
 
     msg = MIMEMultipart()
     msg['From'] = from_email
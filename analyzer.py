@@ -1,8 +1,281 @@
+import re
+import unicodedata
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import accumulate
 from textblob import TextBlob
 
+# Normalized keywords shorter than this only match as plain substrings
+MIN_FUZZY_LENGTH = 4
+
+# Leetspeak and look-alike characters folded onto one letter
+LEET_MAP = str.maketrans({
+    '0': 'o', '1': 'i', 'l': 'i', '|': 'i', '!': 'i', '3': 'e',
+    '4': 'a', '@': 'a', '5': 's', '$': 's', '7': 't', '8': 'b',
+})
+NON_ALNUM = re.compile(r'[^a-z0-9]+')
+ALNUM_RUN = re.compile(r'[a-z0-9]+')
+
+def _fold(text):
+    return unicodedata.normalize('NFKD', text.lower()).translate(LEET_MAP)
+
+def normalize(text):
+    """Fold case, accents, leetspeak and drop everything but letters and digits."""
+    return NON_ALNUM.sub('', _fold(text))
+
+def _normalize_with_boundaries(text):
+    """Normalize text and return the positions where separators were removed.
+
+    Boundaries are offsets in the normalized text, including 0 and its
+    length, sorted ascending.
+    """
+    runs = ALNUM_RUN.findall(_fold(text))
+    return ''.join(runs), list(accumulate(map(len, runs), initial=0))
+
+def _on_boundaries(start, end, boundaries):
+    """True unless norm[start:end] crosses a separator without starting and
+    ending on one, e.g. 'heat' inside 'the attack'."""
+    i = bisect_right(boundaries, start)
+    if i == len(boundaries) or boundaries[i] >= end:
+        return True  # within a single token: plain substring semantics
+    return boundaries[i - 1] == start and boundaries[bisect_right(boundaries, end) - 1] == end
+
+def max_edits(length):
+    """Edit distance tolerated for a normalized keyword of the given length."""
+    if length < 7:
+        return 0
+    if length < 12:
+        return 1
+    return 2
+
+def _edit_distance(a, b, limit):
+    """Edit distance between a and b, or None if it exceeds ``limit``.
+
+    Matching a shared leading character is always optimal, so only a
+    mismatch branches, at most 3 ** limit times.
+    """
+    n = min(len(a), len(b))
+    p = 0
+    while p < n and a[p] == b[p]:
+        p += 1
+    a, b = a[p:], b[p:]
+    if abs(len(a) - len(b)) > limit:
+        return None
+    if not a or not b:
+        return len(a) or len(b)
+    if limit == 0:
+        return None
+    best = None
+    for drop_a, drop_b in ((1, 1), (1, 0), (0, 1)):
+        found = _edit_distance(a[drop_a:], b[drop_b:], limit - 1)
+        if found is not None and (best is None or found + 1 < best):
+            best = found + 1
+    return best
+
+def _count_spans(spans):
+    """Number of non-overlapping occurrences among possibly repeated spans."""
+    count, last_end = 0, -1
+    for start, end in sorted(spans):
+        if start >= last_end:
+            count += 1
+            last_end = end
+        else:
+            last_end = max(last_end, end)
+    return count
+
+def _split(term, parts):
+    """Cut term into ``parts`` pieces of near-equal length."""
+    cuts = [round(i * len(term) / parts) for i in range(parts + 1)]
+    return [term[start:end] for start, end in zip(cuts, cuts[1:])]
+
+def _prefix_edits(pattern, text, limit):
+    """Fewest edits turning pattern into a prefix of text.
+
+    Returns (edits, length of text used), or None if more than ``limit``
+    edits are needed. Matching a shared leading character is always
+    optimal, so only a mismatch branches, at most 3 ** limit times.
+    """
+    if text.startswith(pattern):
+        return 0, len(pattern)
+    if limit == 0:
+        return None
+    n = min(len(pattern), len(text))
+    p = 0
+    while p < n and pattern[p] == text[p]:
+        p += 1
+    if p == len(text):
+        rest = len(pattern) - p  # only deletions are left
+        return (rest, p) if rest <= limit else None
+    best = None
+    # substitute, drop a pattern character, skip a text character
+    for drop, skip in ((1, 1), (1, 0), (0, 1)):
+        found = _prefix_edits(pattern[p + drop:], text[p + skip:], limit - 1)
+        if found is not None and (best is None or found[0] + 1 < best[0]):
+            best = (found[0] + 1, p + skip + found[1])
+    return best
+
+class KeywordIndex:
+    """Exact-piece index over a normalized keyword watchlist.
+
+    Each keyword allowed k edits is cut into k + 1 pieces; by the pigeonhole
+    principle any match within k edits contains one of them unchanged, with
+    the rest of the keyword within k edits on either side. Page substrings
+    are looked up among the pieces and each hit is extended outwards with a
+    bounded edit count, skipping hits inside an occurrence already found.
+    A match that crosses a removed separator must start and end on one.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        self.terms = [normalize(kw) for kw in self.keywords]
+        self.exact = []       # too short to normalize safely, plain substring test
+        # piece -> [(keyword index, k, offset, rest of the term after the
+        #            piece, its parts, part before reversed, its parts)]
+        self.pieces = {}
+
+        for idx, term in enumerate(self.terms):
+            if len(term) < MIN_FUZZY_LENGTH:
+                self.exact.append(idx)
+                continue
+            k = max_edits(len(term))
+            offset = 0
+            for piece in _split(term, k + 1):
+                right = term[offset + len(piece):]
+                left = term[:offset]
+                # Each side is itself within k edits, so one of its k + 1
+                # parts must appear verbatim: a cheap test before extending
+                self.pieces.setdefault(piece, []).append((
+                    idx, k, offset,
+                    right, [part for part in _split(right, k + 1) if part],
+                    left[::-1], [part for part in _split(left, k + 1) if part],
+                ))
+                offset += len(piece)
+
+        # Pieces grouped by their first characters, so each page position
+        # costs one lookup plus one per piece length sharing that head
+        self.head = min((len(piece) for piece in self.pieces), default=0)
+        heads = {}
+        for piece in self.pieces:
+            heads.setdefault(piece[:self.head], set()).add(len(piece))
+        self.heads = {head: sorted(lengths) for head, lengths in heads.items()}
+
+    def _piece_hits(self, norm):
+        """Return {keyword index: [(position, length, entry)]} for piece hits
+        whose surroundings pass the parts test."""
+        found = {}
+        if not self.head:
+            return found
+        head, heads, pieces = self.head, self.heads, self.pieces
+        for pos in range(len(norm) - head + 1):
+            lengths = heads.get(norm[pos:pos + head])
+            if lengths is None:
+                continue
+            for length in lengths:
+                entries = pieces.get(norm[pos:pos + length])
+                if entries is None:
+                    continue
+                for entry in entries:
+                    idx, k, offset, right, right_parts, left, left_parts = entry
+                    if right_parts:
+                        after = norm[pos + length:pos + length + len(right) + k]
+                        for part in right_parts:
+                            if part in after:
+                                break
+                        else:
+                            continue
+                    if left_parts:
+                        before = norm[max(pos - offset - k, 0):pos]
+                        for part in left_parts:
+                            if part in before:
+                                break
+                        else:
+                            continue
+                    found.setdefault(idx, []).append((pos, length, entry))
+        return found
+
+    def _extend(self, pos, length, entry, norm, boundaries):
+        """Verify a piece hit; returns (distance, (start, end)) or None."""
+        idx, k, offset, right, _, left, _ = entry
+        term = self.terms[idx]
+        after = _prefix_edits(right, norm[pos + length:pos + length + len(right) + k], k)
+        if after is None:
+            return None
+        before = _prefix_edits(left, norm[max(pos - offset - k, 0):pos][::-1], k - after[0])
+        if before is None:
+            return None
+        span = (pos - before[1], pos + length + after[1])
+        if _on_boundaries(span[0], span[1], boundaries):
+            return before[0] + after[0], span
+        # The cheapest alignment crosses a separator; try the others this
+        # piece allows, starting within k and k edits long either way
+        best = None
+        origin = pos - offset
+        for start in range(max(origin - k, 0), origin + k + 1):
+            for end in range(start + len(term) - k, min(start + len(term) + k, len(norm)) + 1):
+                if not _on_boundaries(start, end, boundaries):
+                    continue
+                distance = _edit_distance(term, norm[start:end], k if best is None else best[0] - 1)
+                if distance is not None:
+                    best = distance, (start, end)
+        return best
+
+    def match(self, text):
+        """Return {keyword index: (similarity, occurrences)} for keywords in text."""
+        hits = {}
+        lowered = text.lower()
+        for idx in self.exact:
+            occurrences = lowered.count(self.keywords[idx].lower())
+            if occurrences:
+                hits[idx] = (1.0, occurrences)
+
+        norm, boundaries = _normalize_with_boundaries(text)
+        for idx, piece_hits in self._piece_hits(norm).items():
+            best, spans, covered = None, [], -1
+            # In order of the match start each hit implies
+            for pos, length, entry in sorted(piece_hits, key=lambda hit: hit[0] - hit[2][2]):
+                if pos + length <= covered:
+                    continue  # part of an occurrence already verified
+                found = self._extend(pos, length, entry, norm, boundaries)
+                if found is None:
+                    continue
+                distance, span = found
+                best = distance if best is None else min(best, distance)
+                spans.append(span)
+                covered = max(covered, span[1])
+            if spans:
+                hits[idx] = (1 - best / len(self.terms[idx]), _count_spans(spans))
+        return hits
+
+@lru_cache(maxsize=8)
+def _keyword_index(keywords):
+    return KeywordIndex(keywords)
+
+def keyword_hits(text, keywords):
+    """Return (keyword, similarity, occurrences) for keywords found in text."""
+    hits = _keyword_index(tuple(keywords)).match(text)
+    return [(kw, *hits[idx]) for idx, kw in enumerate(keywords) if idx in hits]
+
+def match_keywords(text, keywords):
+    """Return (keyword, similarity) pairs for keywords found in text.
+
+    Similarity is 1.0 for an exact match after normalization and lower
+    for matches that needed edits.
+
+    >>> match_keywords("Selling c 0 m p a n y creds, mail j o h n @ acme . com",
+    ...                ["company", "john@acme.com"])
+    [('company', 1.0), ('john@acme.com', 1.0)]
+    >>> match_keywords("securebnk logins", ["securebank"])
+    [('securebank', 0.9)]
+    >>> match_keywords("Meet us at the attack site. This is camping gear.", ["heat", "scam"])
+    []
+    >>> match_keywords("admin, password reset", ["adminpass"])
+    []
+    """
+    return [(kw, score) for kw, score, _ in keyword_hits(text, keywords)]
+
 def analyze_text(text, keywords):
-    
-    detected_keywords = [kw for kw in keywords if kw.lower() in text.lower()]
+
+    detected_keywords = [kw for kw, _ in match_keywords(text, keywords)]
     return detected_keywords
 
 def sentiment_analysis(text):
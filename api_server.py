@@ -0,0 +1,257 @@
+import argparse
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, unquote
+
+from retention import query_findings
+from rollups import keyword_trend, sentiment_trend
+
+DB_NAME = "darkweb_data.db"
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# Upper bound on trend periods; far larger windows overflow the date range
+MAX_PERIODS = 10000
+CACHE_SIZE = 256
+
+_conn = None
+_db_lock = threading.Lock()
+
+
+def _connection():
+    """Return the shared read-only connection; call with ``_db_lock`` held."""
+    global _conn
+    if _conn is None:
+        _conn = sqlite3.connect(f"file:{DB_NAME}?mode=ro", uri=True, check_same_thread=False)
+    return _conn
+
+
+def _query(sql, params=()):
+    """Run a query on the shared read-only connection."""
+    with _db_lock:
+        return _connection().execute(sql, params).fetchall()
+
+
+class ResponseCache:
+    """LRU cache of rendered responses, dropped whenever the database changes.
+
+    ``PRAGMA data_version`` changes whenever another connection commits, so
+    polling it is enough to detect new writes without touching any table.
+    ``get`` returns the version it saw; ``put`` drops the entry if a write
+    has landed since, so a payload built from older data is never cached.
+    """
+
+    def __init__(self, size=CACHE_SIZE):
+        self.size = size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.version = None
+
+    def get(self, key):
+        """Return (entry or None, data version)."""
+        with self.lock:
+            version = _query("PRAGMA data_version")[0][0]
+            if version != self.version:
+                self.entries.clear()
+                self.version = version
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry, version
+
+    def put(self, key, entry, version):
+        with self.lock:
+            if _query("PRAGMA data_version")[0][0] != version:
+                return
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+
+_cache = ResponseCache()
+
+
+class BadRequest(Exception):
+    pass
+
+
+def _int_param(params, name, default, maximum=None):
+    try:
+        value = int(params.get(name, [default])[0])
+    except ValueError:
+        raise BadRequest(f"'{name}' must be an integer")
+    if value < 0:
+        raise BadRequest(f"'{name}' must not be negative")
+    return min(value, maximum) if maximum is not None else value
+
+
+def _row_to_finding(row):
+    row_id, url, keywords, sentiment, snippet, scraped_at = row
+    return {
+        'id': row_id,
+        'url': url,
+        'keywords': [kw for kw in (keywords or "").split(', ') if kw],
+        'sentiment': sentiment,
+        'snippet': snippet,
+        'scraped_at': scraped_at,
+    }
+
+
+def _page(rows, since):
+    """Wrap a keyset page; the cursor is the last id returned."""
+    findings = [_row_to_finding(row) for row in rows]
+    return {
+        'items': findings,
+        'next_cursor': findings[-1]['id'] if findings else since,
+    }
+
+
+def get_findings(params):
+    """Findings with id greater than the ``since`` cursor, oldest first."""
+    since = _int_param(params, 'since', 0)
+    limit = _int_param(params, 'limit', DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+    with _db_lock:
+        rows = query_findings(since=since, limit=limit, conn=_connection())
+    return _page(rows, since)
+
+
+def get_keyword_findings(keyword, params):
+    """Findings that matched ``keyword``, paged the same way as /findings."""
+    since = _int_param(params, 'since', 0)
+    limit = _int_param(params, 'limit', DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+    with _db_lock:
+        rows = query_findings(keyword=keyword, since=since, limit=limit, conn=_connection())
+    return _page(rows, since)
+
+
+def _trend_params(params):
+    granularity = params.get('granularity', ['day'])[0]
+    if granularity not in ('hour', 'day'):
+        raise BadRequest("'granularity' must be 'hour' or 'day'")
+    return granularity, _int_param(params, 'periods', 90, MAX_PERIODS)
+
+
+def get_keyword_aggregates(params):
+    granularity, periods = _trend_params(params)
+    with _db_lock:
+        rows = keyword_trend(
+            keyword=params.get('keyword', [None])[0],
+            host=params.get('host', [None])[0],
+            granularity=granularity,
+            periods=periods,
+            conn=_connection(),
+        )
+    return {'items': [
+        {'bucket': bucket, 'host': host, 'keyword': keyword, 'hits': hits}
+        for bucket, host, keyword, hits in rows
+    ]}
+
+
+def get_sentiment_aggregates(params):
+    granularity, periods = _trend_params(params)
+    with _db_lock:
+        rows = sentiment_trend(
+            host=params.get('host', [None])[0],
+            granularity=granularity,
+            periods=periods,
+            conn=_connection(),
+        )
+    return {'items': [
+        {'bucket': bucket, 'host': host, 'sentiment': sentiment, 'pages': pages}
+        for bucket, host, sentiment, pages in rows
+    ]}
+
+
+def route(path, params):
+    """Dispatch a request path to its handler, or return None if unknown."""
+    if path == '/findings':
+        return get_findings(params)
+    if path.startswith('/keywords/') and len(path) > len('/keywords/'):
+        return get_keyword_findings(unquote(path[len('/keywords/'):]), params)
+    if path == '/aggregates/keywords':
+        return get_keyword_aggregates(params)
+    if path == '/aggregates/sentiment':
+        return get_sentiment_aggregates(params)
+    return None
+
+
+class APIRequestHandler(BaseHTTPRequestHandler):
+    server_version = "DarkWebMonitorAPI/1.0"
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        key = (parts.path, parts.query)
+        if parts.path.startswith('/aggregates/'):
+            # Trend windows slide with the clock, not only on new writes
+            key += (datetime.now(timezone.utc).strftime("%Y-%m-%d %H"),)
+
+        try:
+            entry, version = _cache.get(key)
+            if entry is None:
+                payload = route(parts.path, parse_qs(parts.query))
+                if payload is None:
+                    self._send_json(404, {'error': f"Unknown endpoint: {parts.path}"})
+                    return
+                body = json.dumps(payload).encode('utf-8')
+                entry = (f'"{hashlib.sha1(body).hexdigest()}"', body)
+                _cache.put(key, entry, version)
+        except BadRequest as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        except sqlite3.Error as e:
+            self._send_json(503, {'error': f"Database error: {e}"})
+            return
+        except Exception as e:
+            print(f"Error handling {self.path}: {e!r}")
+            self._send_json(500, {'error': "Internal server error"})
+            return
+
+        etag, body = entry
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read-only JSON API over the findings database.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), APIRequestHandler)
+    print(f"Serving findings API on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
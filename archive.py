@@ -0,0 +1,227 @@
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import zstandard
+except ImportError:
+    # The scrapers treat archiving as best-effort and keep running without it
+    zstandard = None
+
+from analyzer import analyze_text, sentiment_analysis
+
+ARCHIVE_DIR = "page_archive"
+INDEX_NAME = "index.db"
+SEGMENT_MAX_BYTES = 64 * 1024 * 1024  # roll over to a new segment at 64 MB
+COMPRESSION_LEVEL = 10
+PAGES_PER_TASK = 256
+
+_write_lock = threading.Lock()
+
+
+def _require_zstandard():
+    if zstandard is None:
+        raise RuntimeError("the page archive needs the 'zstandard' package")
+
+
+def _index_path(archive_dir):
+    return os.path.join(archive_dir, INDEX_NAME)
+
+
+def _segment_path(archive_dir, segment):
+    return os.path.join(archive_dir, f"segment_{segment:05d}.seg")
+
+
+def initialize_archive(archive_dir=ARCHIVE_DIR):
+    """Create the archive directory and its index if they don't exist."""
+    os.makedirs(archive_dir, exist_ok=True)
+    conn = sqlite3.connect(_index_path(archive_dir))
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS pages (
+            hash TEXT PRIMARY KEY,
+            segment INTEGER NOT NULL,
+            offset INTEGER NOT NULL,
+            length INTEGER NOT NULL,
+            raw_length INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS page_refs (
+            url TEXT NOT NULL,
+            hash TEXT NOT NULL,
+            archived_at REAL NOT NULL
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_page_refs_hash ON page_refs (hash)")
+    conn.commit()
+    conn.close()
+
+
+def _current_segment(cursor, archive_dir):
+    """Return the segment new pages should be appended to."""
+    cursor.execute("SELECT MAX(segment) FROM pages")
+    segment = cursor.fetchone()[0] or 0
+    path = _segment_path(archive_dir, segment)
+    if os.path.exists(path) and os.path.getsize(path) >= SEGMENT_MAX_BYTES:
+        segment += 1
+    return segment
+
+
+def archive_page(url, text, archive_dir=ARCHIVE_DIR):
+    """Store the extracted text of a page, deduplicated by its SHA-256.
+
+    Returns the content hash. Identical pages are only compressed and
+    written once; every fetch is still recorded in ``page_refs``.
+
+    The index write lock (BEGIN IMMEDIATE) is held across the segment
+    append, so several processes can share one archive directory.
+    """
+    _require_zstandard()
+    data = text.encode("utf-8")
+    digest = hashlib.sha256(data).hexdigest()
+
+    conn = sqlite3.connect(_index_path(archive_dir), timeout=30, isolation_level=None)
+    cursor = conn.cursor()
+    # Compress before taking the lock; the check is repeated inside it
+    cursor.execute("SELECT 1 FROM pages WHERE hash = ?", (digest,))
+    compressed = None
+    if cursor.fetchone() is None:
+        compressed = zstandard.ZstdCompressor(level=COMPRESSION_LEVEL).compress(data)
+
+    with _write_lock:
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            cursor.execute("SELECT 1 FROM pages WHERE hash = ?", (digest,))
+            if cursor.fetchone() is None:
+                if compressed is None:
+                    compressed = zstandard.ZstdCompressor(level=COMPRESSION_LEVEL).compress(data)
+                segment = _current_segment(cursor, archive_dir)
+                with open(_segment_path(archive_dir, segment), "ab") as f:
+                    offset = f.seek(0, os.SEEK_END)
+                    f.write(compressed)
+                    f.flush()
+                    os.fsync(f.fileno())
+                cursor.execute('''
+                    INSERT OR IGNORE INTO pages (hash, segment, offset, length, raw_length)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (digest, segment, offset, len(compressed), len(data)))
+            cursor.execute('''
+                INSERT INTO page_refs (url, hash, archived_at)
+                VALUES (?, ?, ?)
+            ''', (url, digest, time.time()))
+            cursor.execute("COMMIT")
+        except BaseException:
+            cursor.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    return digest
+
+
+def read_page(digest, archive_dir=ARCHIVE_DIR):
+    """Return the archived text for a content hash, or None if unknown."""
+    _require_zstandard()
+    conn = sqlite3.connect(_index_path(archive_dir))
+    cursor = conn.cursor()
+    cursor.execute("SELECT segment, offset, length FROM pages WHERE hash = ?", (digest,))
+    row = cursor.fetchone()
+    conn.close()
+    if row is None:
+        return None
+
+    segment, offset, length = row
+    with open(_segment_path(archive_dir, segment), "rb") as f:
+        f.seek(offset)
+        compressed = f.read(length)
+    return zstandard.ZstdDecompressor().decompress(compressed).decode("utf-8")
+
+
+def _analyze_segment_chunk(path, entries, keywords):
+    """Worker: decompress and analyze a slice of one segment via mmap."""
+    decompressor = zstandard.ZstdDecompressor()
+    results = []
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for digest, offset, length in entries:
+            view = memoryview(mm)[offset:offset + length]
+            try:
+                text = decompressor.decompress(view).decode("utf-8")
+            finally:
+                view.release()
+            results.append({
+                'hash': digest,
+                'keywords': analyze_text(text, keywords),
+                'sentiment': sentiment_analysis(text),
+            })
+    return results
+
+
+def reanalyze(keywords, archive_dir=ARCHIVE_DIR, workers=None):
+    """Re-run keyword and sentiment analysis over every archived page.
+
+    Work is split into per-segment chunks and spread over a process pool
+    (one worker per core by default). No network access is needed.
+    """
+    _require_zstandard()
+    conn = sqlite3.connect(_index_path(archive_dir))
+    cursor = conn.cursor()
+    cursor.execute("SELECT hash, segment, offset, length FROM pages ORDER BY segment, offset")
+    by_segment = {}
+    for digest, segment, offset, length in cursor.fetchall():
+        by_segment.setdefault(segment, []).append((digest, offset, length))
+    cursor.execute("SELECT hash, url FROM page_refs ORDER BY archived_at")
+    urls = {}
+    for digest, url in cursor.fetchall():
+        if url not in urls.setdefault(digest, []):
+            urls[digest].append(url)
+    conn.close()
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = []
+        for segment, entries in by_segment.items():
+            path = _segment_path(archive_dir, segment)
+            for start in range(0, len(entries), PAGES_PER_TASK):
+                chunk = entries[start:start + PAGES_PER_TASK]
+                futures.append(pool.submit(_analyze_segment_chunk, path, chunk, keywords))
+        for future in futures:
+            for result in future.result():
+                result['urls'] = urls.get(result['hash'], [])
+                results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline tools for the page archive.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    reanalyze_parser = subparsers.add_parser("reanalyze", help="Re-run analysis over archived pages")
+    reanalyze_parser.add_argument("--keywords", required=True, help="Comma-separated keywords")
+    reanalyze_parser.add_argument("--archive-dir", default=ARCHIVE_DIR)
+    reanalyze_parser.add_argument("--workers", type=int, default=None)
+    reanalyze_parser.add_argument("--output", help="Write results as JSON to this file")
+
+    args = parser.parse_args()
+
+    if args.command == "reanalyze":
+        keywords = [keyword.strip() for keyword in args.keywords.split(',')]
+        results = reanalyze(keywords, args.archive_dir, args.workers)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(results, f, indent=4)
+            print(f"Results for {len(results)} pages written to {args.output}")
+        else:
+            for result in results:
+                if result['keywords']:
+                    print(f"{', '.join(result['urls'])}: {result['keywords']} ({result['sentiment']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Compare response.text with scraper.decode_page on large undeclared pages.
+
+Builds multi-MB HTML bodies with no Content-Type header and no <meta
+charset>, the case where requests runs charset detection over the whole
+body, and times both decoders.
+
+    python bench_decode.py [--sizes 1 4 8] [--repeat 3]
+"""
+import argparse
+import time
+
+from requests.models import Response
+
+import scraper
+
+SAMPLE_TEXT = {
+    'utf-8': "Продам базу клиентов, логины и пароли, свежая выгрузка. ",
+    'windows-1251': "Продам базу клиентов, логины и пароли, свежая выгрузка. ",
+    'iso-8859-1': "Données clients à vendre, accès complets, fraîchement extraits. ",
+}
+
+
+def build_body(encoding, size_mb):
+    paragraph = f"<p>{SAMPLE_TEXT[encoding]}</p>\n"
+    html = "<html><head><title>market</title></head><body>\n"
+    html += paragraph * (size_mb * 1024 * 1024 // len(paragraph.encode(encoding)))
+    html += "</body></html>"
+    return html.encode(encoding)
+
+
+def make_response(body, url):
+    response = Response()
+    response._content = body
+    response.status_code = 200
+    response.url = url
+    response.encoding = None  # what requests sets when there is no Content-Type
+    return response
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 4, 8], help="page sizes in MB")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'encoding':>14} {'size':>6} {'response.text':>14} {'decode (cold)':>14} {'decode (warm)':>14}")
+    for encoding in SAMPLE_TEXT:
+        for size_mb in args.sizes:
+            body = build_body(encoding, size_mb)
+            url = f"http://{encoding}-{size_mb}.onion/"
+
+            baseline = best_of(args.repeat, lambda: make_response(body, url).text)
+
+            def cold():
+                scraper._host_encodings.clear()
+                return scraper.decode_page(make_response(body, url))
+            cold_time = best_of(args.repeat, cold)
+            warm_time = best_of(args.repeat, lambda: scraper.decode_page(make_response(body, url)))
+
+            assert scraper.decode_page(make_response(body, url)) == body.decode(encoding)
+            print(f"{encoding:>14} {size_mb:>4}MB {baseline:>13.3f}s {cold_time:>13.3f}s {warm_time:>13.3f}s")
+
+
+if __name__ == "__main__":
+    main()
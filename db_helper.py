@@ -1,31 +1,97 @@
 import sqlite3
+from rollups import create_rollup_tables, apply_rollups, catch_up_rollups
+from retention import create_partition_table
 
 DB_NAME = "darkweb_data.db"
 
+def _add_missing_columns(cursor):
+    """Bring databases created by older versions up to the current schema."""
+    cursor.execute("PRAGMA table_info(scraped_data)")
+    columns = {row[1] for row in cursor.fetchall()}
+    if 'scraped_at' not in columns:
+        # ALTER TABLE cannot add a column with a non-constant default, and
+        # older rows carry no timestamp, so date them at migration time
+        cursor.execute("ALTER TABLE scraped_data ADD COLUMN scraped_at TEXT")
+        cursor.execute("UPDATE scraped_data SET scraped_at = CURRENT_TIMESTAMP")
+    if 'rolled_up' not in columns:
+        cursor.execute("ALTER TABLE scraped_data ADD COLUMN rolled_up INTEGER NOT NULL DEFAULT 0")
+    # Stands in for the column default that ALTER TABLE could not add
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS scraped_data_default_scraped_at
+        AFTER INSERT ON scraped_data WHEN NEW.scraped_at IS NULL
+        BEGIN
+            UPDATE scraped_data SET scraped_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+        END
+    ''')
+
+def _create_keyword_hits(cursor):
+    """Create the keyword -> row lookup table, backfilling it on first creation."""
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'keyword_hits'")
+    exists = cursor.fetchone() is not None
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS keyword_hits (
+            keyword TEXT NOT NULL,
+            scraped_id INTEGER NOT NULL,
+            PRIMARY KEY (keyword, scraped_id)
+        ) WITHOUT ROWID
+    ''')
+    if exists:
+        return
+    cursor.execute("SELECT id, keywords FROM scraped_data WHERE keywords != ''")
+    for row_id, keywords in cursor.fetchall():
+        cursor.executemany(
+            "INSERT OR IGNORE INTO keyword_hits (keyword, scraped_id) VALUES (?, ?)",
+            [(keyword, row_id) for keyword in keywords.split(', ')]
+        )
+
 def initialize_database():
     """Create the database and table if they don't exist."""
     conn = sqlite3.connect(DB_NAME)
     cursor = conn.cursor()
+    # Only takes effect on a new database; older ones are switched once with
+    # retention.py --enable-incremental-vacuum
+    cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    # WAL lets the retention job and API readers run alongside scrapes
+    cursor.execute("PRAGMA journal_mode=WAL")
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS scraped_data (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             url TEXT NOT NULL,
             keywords TEXT,
             sentiment REAL,
-            content_snippet TEXT
+            content_snippet TEXT,
+            scraped_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            rolled_up INTEGER NOT NULL DEFAULT 0
         )
     ''')
+    _add_missing_columns(cursor)
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_scraped_data_pending_rollup
+        ON scraped_data (id) WHERE rolled_up = 0
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_scraped_data_scraped_at ON scraped_data (scraped_at)")
+    _create_keyword_hits(cursor)
+    create_partition_table(cursor)
+    create_rollup_tables(cursor)
     conn.commit()
     conn.close()
+    catch_up_rollups()
 
 def insert_data(url, keywords, sentiment, content_snippet):
-    """Insert a new record into the database."""
+    """Insert a new record into the database and update the rollups."""
     conn = sqlite3.connect(DB_NAME)
     cursor = conn.cursor()
     cursor.execute('''
-        INSERT INTO scraped_data (url, keywords, sentiment, content_snippet)
-        VALUES (?, ?, ?, ?)
+        INSERT INTO scraped_data (url, keywords, sentiment, content_snippet, scraped_at, rolled_up)
+        VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP, 1)
     ''', (url, ', '.join(keywords), sentiment, content_snippet))
+    row_id = cursor.lastrowid
+    cursor.executemany(
+        "INSERT OR IGNORE INTO keyword_hits (keyword, scraped_id) VALUES (?, ?)",
+        [(keyword, row_id) for keyword in keywords]
+    )
+    cursor.execute("SELECT scraped_at FROM scraped_data WHERE id = ?", (row_id,))
+    apply_rollups(cursor, url, keywords, sentiment, cursor.fetchone()[0])
     conn.commit()
     conn.close()
     print(f"Data saved for URL: {url}")
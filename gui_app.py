@@ -6,15 +6,18 @@ import os
 import time
 from tor_connection import connect_to_tor
 from scraper import scrape_onion_site
-from analyzer import analyze_text, sentiment_analysis
+from analyzer import keyword_hits, sentiment_analysis
 from db_helper import initialize_database, insert_data
+from archive import initialize_archive, archive_page
 from alerts import send_email
+from scoring import rank_results
 
 class DarkWebMonitorApp:
     def __init__(self, root):
         self.root = root
         self.root.title("Dark Web Monitoring Tool")
         self.root.geometry("800x600")
+        self.results = []
         
         # Configure style
         self.style = ttkb.Style(theme='darkly')
@@ -56,12 +59,13 @@ class DarkWebMonitorApp:
         # Results Table
         self.results_table = ttk.Treeview(
             self.results_frame, 
-            columns=('URL', 'Keywords', 'Sentiment', 'Snippet'), 
+            columns=('URL', 'Keywords', 'Sentiment', 'Score', 'Snippet'), 
             show='headings'
         )
         self.results_table.heading('URL', text='URL')
         self.results_table.heading('Keywords', text='Keywords')
         self.results_table.heading('Sentiment', text='Sentiment')
+        self.results_table.heading('Score', text='Score')
         self.results_table.heading('Snippet', text='Snippet')
         
         # Scrollbar for results
@@ -109,6 +113,7 @@ class DarkWebMonitorApp:
         
         # Initialize Database
         initialize_database()
+        initialize_archive()
     
     def start_scraping_thread(self):
         """Start scraping in a separate thread to keep GUI responsive"""
@@ -120,6 +125,7 @@ class DarkWebMonitorApp:
             return
         
         # Clear previous results
+        self.results = []
         for i in self.results_table.get_children():
             self.results_table.delete(i)
         
@@ -148,19 +154,27 @@ class DarkWebMonitorApp:
                     soup = scrape_onion_site(url, session)
                     if soup:
                         text = soup.get_text()
-                        detected_keywords = analyze_text(text, keywords)
+                        hits = keyword_hits(text, keywords)
+                        detected_keywords = [kw for kw, _, _ in hits]
                         sentiment = sentiment_analysis(text)
                         
                         # Insert into database
                         insert_data(url, detected_keywords, sentiment, text[:200])
+                        # Archive last so an archive failure never costs the finding
+                        try:
+                            archive_page(url, text)
+                        except Exception as e:
+                            print(f"Error archiving {url}: {e}")
                         
                         # Populate results table
-                        scraped_item = (
-                            url, 
-                            ", ".join(detected_keywords), 
-                            sentiment, 
-                            text[:200]
-                        )
+                        scraped_item = {
+                            'url': url,
+                            'keywords': detected_keywords,
+                            'sentiment': sentiment,
+                            'snippet': text[:200],
+                            'similarities': {kw: similarity for kw, similarity, _ in hits},
+                            'hit_counts': {kw: count for kw, _, count in hits}
+                        }
                         scraped_data.append(scraped_item)
                         
                         # Update GUI
@@ -176,8 +190,19 @@ class DarkWebMonitorApp:
             self.root.after(0, self.scraping_complete)
     
     def update_results_table(self, result):
-        """Thread-safe method to update results table"""
-        self.results_table.insert('', 'end', values=result)
+        """Thread-safe method to update results table, highest score first"""
+        self.results.append(result)
+        self.results = rank_results(self.results)
+        for i in self.results_table.get_children():
+            self.results_table.delete(i)
+        for item in self.results:
+            self.results_table.insert('', 'end', values=(
+                item['url'],
+                ", ".join(item['keywords']),
+                item['sentiment'],
+                f"{item['score']:.3f}",
+                item['snippet']
+            ))
     
     def scraping_complete(self):
         """Reset UI after scraping"""
@@ -1,3 +1,4 @@
+import argparse
 import os
 import time
 import sys
@@ -17,9 +18,12 @@ import threading
 # Import your existing modules
 from tor_connection import connect_to_tor
 from scraper import scrape_onion_site
-from analyzer import analyze_text, sentiment_analysis
+from analyzer import keyword_hits, sentiment_analysis
 from db_helper import initialize_database, insert_data
+from archive import initialize_archive, archive_page
 from alerts import send_email
+from scoring import rank_results
+from profiling import PipelineProfiler
 
 class LogFormatter(logging.Formatter):
     """Custom log formatter to make logs more readable"""
@@ -38,15 +42,17 @@ class LogFormatter(logging.Formatter):
         return log_fmt
 
 class TerminalDarkWebMonitor:
-    def __init__(self, log_level=logging.INFO):
+    def __init__(self, log_level=logging.INFO, profiler=None):
         # Setup console
         self.console = Console()
+        self.profiler = profiler or PipelineProfiler()
         
         # Setup logging
         self.logger = self._setup_logging(log_level)
         
         # Initialize database
         initialize_database()
+        initialize_archive()
         
         # Log initialization
         self.logger.info("Dark Web Monitoring Tool Initialized")
@@ -141,29 +147,43 @@ class TerminalDarkWebMonitor:
 
             for url in urls:
                 try:
-                    progress.update(overall_task, advance=0, description=f"[yellow]Scraping {url}")
-                    self.logger.info(f"Attempting to scrape URL: {url}")
+                    with self.profiler.url(url):
+                        progress.update(overall_task, advance=0, description=f"[yellow]Scraping {url}")
+                        self.logger.info(f"Attempting to scrape URL: {url}")
         
-                    soup = scrape_onion_site(url, session)
-                    if soup:
-                        text = soup.get_text()
-                        detected_keywords = analyze_text(text, keywords)
-                        sentiment = sentiment_analysis(text)
+                        soup = scrape_onion_site(url, session, self.profiler)
+                        if soup:
+                            with self.profiler.stage('parse'):
+                                text = soup.get_text()
+                            with self.profiler.stage('keyword_match'):
+                                hits = keyword_hits(text, keywords)
+                                detected_keywords = [kw for kw, _, _ in hits]
+                            with self.profiler.stage('sentiment'):
+                                sentiment = sentiment_analysis(text)
 
-                        result = {
-                            'url': url,
-                            'keywords': detected_keywords,
-                            'sentiment': sentiment,
-                            'snippet': text[:200]
-                        }
-                        results.append(result)
+                            result = {
+                                'url': url,
+                                'keywords': detected_keywords,
+                                'sentiment': sentiment,
+                                'snippet': text[:200],
+                                'similarities': {kw: similarity for kw, similarity, _ in hits},
+                                'hit_counts': {kw: count for kw, _, count in hits}
+                            }
+                            results.append(result)
 
-                        insert_data(url, detected_keywords, sentiment, text[:200])
+                            with self.profiler.stage('db_write'):
+                                insert_data(url, detected_keywords, sentiment, text[:200])
+                            # Archive last so an archive failure never costs the finding
+                            try:
+                                with self.profiler.stage('archive'):
+                                    archive_page(url, text)
+                            except Exception as e:
+                                self.logger.error(f"Error archiving {url}: {e}")
                         
-                        # Log successful scraping and findings
-                        if detected_keywords:
-                            self.logger.warning(f"Keywords detected on {url}: {detected_keywords}")
-                        self.logger.info(f"Scraped {url} successfully. Sentiment: {sentiment}")
+                            # Log successful scraping and findings
+                            if detected_keywords:
+                                self.logger.warning(f"Keywords detected on {url}: {detected_keywords}")
+                            self.logger.info(f"Scraped {url} successfully. Sentiment: {sentiment}")
                     
                     progress.update(overall_task, advance=1)
                     time.sleep(1) 
@@ -183,6 +203,7 @@ class TerminalDarkWebMonitor:
 
         # Create results table
         table = Table(title="Dark Web Monitoring Results")
+        table.add_column("Score", style="bold red")
         table.add_column("URL", style="cyan")
         table.add_column("Keywords", style="green")
         table.add_column("Sentiment", style="magenta")
@@ -190,6 +211,7 @@ class TerminalDarkWebMonitor:
 
         for result in results:
             table.add_row(
+                f"{result['score']:.2f}",
                 result['url'], 
                 ", ".join(result['keywords']), 
                 result['sentiment'], 
@@ -220,7 +242,9 @@ class TerminalDarkWebMonitor:
                             json.dump(results, f, indent=4)
                         else:
                             import csv
-                            writer = csv.DictWriter(f, fieldnames=results[0].keys())
+                            # Per-keyword dicts only make sense in the JSON export
+                            fieldnames = [k for k in results[0] if k not in ('similarities', 'hit_counts')]
+                            writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
                             writer.writeheader()
                             writer.writerows(results)
                     
@@ -244,6 +268,14 @@ class TerminalDarkWebMonitor:
                 self.logger.error(f"Email sending failed: {e}")
                 self.console.print(f"[bold red]Email sending failed: {e}")
 
+    def report_profile(self):
+        """Write the per-URL stage timings when profiling is enabled"""
+        if not self.profiler.enabled:
+            return
+        for path in self.profiler.write_report():
+            self.logger.info(f"Profile written to {path}")
+            self.console.print(f"[bold green]Profile written to {path}")
+
     def run(self):
         """Main application flow with logging"""
         try:
@@ -256,8 +288,12 @@ class TerminalDarkWebMonitor:
             # Get user input
             urls, keywords = self.get_user_input()
             
-            # Scrape with progress
+            # Scrape with progress, highest threat score first
             results = self.scrape_with_progress(urls, keywords)
+            results = rank_results(results)
+            
+            # Profiling report (--profile)
+            self.report_profile()
             
             # Display results
             self.display_results(results)
@@ -273,8 +309,20 @@ class TerminalDarkWebMonitor:
             self.console.print(f"[bold red]An unexpected error occurred: {e}")
 
 def main():
+    parser = argparse.ArgumentParser(description="Dark Web Monitoring Tool")
+    parser.add_argument("--profile", action="store_true",
+                        help="time each pipeline stage per URL and write a slowest-URL report")
+    parser.add_argument("--profile-sample", type=float, default=0.0, metavar="RATE",
+                        help="fraction of URLs to also run under cProfile (with --profile)")
+    parser.add_argument("--profile-top", type=int, default=20, metavar="N",
+                        help="number of slowest URLs in the report")
+    args = parser.parse_args()
+    profiler = PipelineProfiler(
+        enabled=args.profile, sample_rate=args.profile_sample, top_n=args.profile_top
+    )
+
     try:
-        monitor = TerminalDarkWebMonitor()
+        monitor = TerminalDarkWebMonitor(profiler=profiler)
         monitor.run()
     except KeyboardInterrupt:
         print("\n[bold red]Operation cancelled by user.")
@@ -1,3 +1,4 @@
+import argparse
 import os
 import time
 import sys
@@ -15,14 +16,19 @@ import threading
 # Import your existing modules
 from tor_connection import connect_to_tor
 from scraper import scrape_onion_site
-from analyzer import analyze_text, sentiment_analysis
+from analyzer import keyword_hits, sentiment_analysis
 from db_helper import initialize_database, insert_data
+from archive import initialize_archive, archive_page
 from alerts import send_email
+from scoring import rank_results
+from profiling import PipelineProfiler
 
 class TerminalDarkWebMonitor:
-    def __init__(self):
+    def __init__(self, profiler=None):
         self.console = Console()
+        self.profiler = profiler or PipelineProfiler()
         initialize_database()
+        initialize_archive()
 
     def draw_banner(self):
         banner = Panel(
@@ -74,23 +80,37 @@ class TerminalDarkWebMonitor:
 
             for url in urls:
                 try:
-                    progress.update(overall_task, advance=0, description=f"[yellow]Scraping {url}")
+                    with self.profiler.url(url):
+                        progress.update(overall_task, advance=0, description=f"[yellow]Scraping {url}")
         
-                    soup = scrape_onion_site(url, session)
-                    if soup:
-                        text = soup.get_text()
-                        detected_keywords = analyze_text(text, keywords)
-                        sentiment = sentiment_analysis(text)
-
-                        result = {
-                            'url': url,
-                            'keywords': detected_keywords,
-                            'sentiment': sentiment,
-                            'snippet': text[:200]
-                        }
-                        results.append(result)
-
-                        insert_data(url, detected_keywords, sentiment, text[:200])
+                        soup = scrape_onion_site(url, session, self.profiler)
+                        if soup:
+                            with self.profiler.stage('parse'):
+                                text = soup.get_text()
+                            with self.profiler.stage('keyword_match'):
+                                hits = keyword_hits(text, keywords)
+                                detected_keywords = [kw for kw, _, _ in hits]
+                            with self.profiler.stage('sentiment'):
+                                sentiment = sentiment_analysis(text)
+
+                            result = {
+                                'url': url,
+                                'keywords': detected_keywords,
+                                'sentiment': sentiment,
+                                'snippet': text[:200],
+                                'similarities': {kw: similarity for kw, similarity, _ in hits},
+                                'hit_counts': {kw: count for kw, _, count in hits}
+                            }
+                            results.append(result)
+
+                            with self.profiler.stage('db_write'):
+                                insert_data(url, detected_keywords, sentiment, text[:200])
+                            # Archive last so an archive failure never costs the finding
+                            try:
+                                with self.profiler.stage('archive'):
+                                    archive_page(url, text)
+                            except Exception as e:
+                                self.console.print(f"[bold red]Error archiving {url}: {e}")
                     
                     progress.update(overall_task, advance=1)
                     time.sleep(1) 
@@ -108,6 +128,7 @@ class TerminalDarkWebMonitor:
 
         # Create results table
         table = Table(title="Dark Web Monitoring Results")
+        table.add_column("Score", style="bold red")
         table.add_column("URL", style="cyan")
         table.add_column("Keywords", style="green")
         table.add_column("Sentiment", style="magenta")
@@ -115,6 +136,7 @@ class TerminalDarkWebMonitor:
 
         for result in results:
             table.add_row(
+                f"{result['score']:.2f}",
                 result['url'], 
                 ", ".join(result['keywords']), 
                 result['sentiment'], 
@@ -143,7 +165,9 @@ class TerminalDarkWebMonitor:
                         json.dump(results, f, indent=4)
                     else:
                         import csv
-                        writer = csv.DictWriter(f, fieldnames=results[0].keys())
+                        # Per-keyword dicts only make sense in the JSON export
+                        fieldnames = [k for k in results[0] if k not in ('similarities', 'hit_counts')]
+                        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
                         writer.writeheader()
                         writer.writerows(results)
                 
@@ -160,6 +184,13 @@ class TerminalDarkWebMonitor:
             except Exception as e:
                 self.console.print(f"[bold red]Email sending failed: {e}")
 
+    def report_profile(self):
+        """Write the per-URL stage timings when profiling is enabled"""
+        if not self.profiler.enabled:
+            return
+        for path in self.profiler.write_report():
+            self.console.print(f"[bold green]Profile written to {path}")
+
     def run(self):
         """Main application flow"""
         # Clear screen (cross-platform)
@@ -171,8 +202,12 @@ class TerminalDarkWebMonitor:
         # Get user input
         urls, keywords = self.get_user_input()
         
-        # Scrape with progress
+        # Scrape with progress, highest threat score first
         results = self.scrape_with_progress(urls, keywords)
+        results = rank_results(results)
+        
+        # Profiling report (--profile)
+        self.report_profile()
         
         # Display results
         self.display_results(results)
@@ -184,8 +219,20 @@ class TerminalDarkWebMonitor:
         self.email_option()
 
 def main():
+    parser = argparse.ArgumentParser(description="Dark Web Monitoring Tool")
+    parser.add_argument("--profile", action="store_true",
+                        help="time each pipeline stage per URL and write a slowest-URL report")
+    parser.add_argument("--profile-sample", type=float, default=0.0, metavar="RATE",
+                        help="fraction of URLs to also run under cProfile (with --profile)")
+    parser.add_argument("--profile-top", type=int, default=20, metavar="N",
+                        help="number of slowest URLs in the report")
+    args = parser.parse_args()
+    profiler = PipelineProfiler(
+        enabled=args.profile, sample_rate=args.profile_sample, top_n=args.profile_top
+    )
+
     try:
-        monitor = TerminalDarkWebMonitor()
+        monitor = TerminalDarkWebMonitor(profiler=profiler)
         monitor.run()
     except KeyboardInterrupt:
         print("\n[bold red]Operation cancelled by user.")
@@ -0,0 +1,130 @@
+import cProfile
+import os
+import pstats
+import random
+import time
+from contextlib import nullcontext
+
+STAGES = ('fetch', 'decode', 'parse', 'keyword_match', 'sentiment', 'archive', 'db_write')
+
+_NULL_CONTEXT = nullcontext()
+
+
+class _StageTimer:
+    __slots__ = ('record', 'name', 'start')
+
+    def __init__(self, record, name):
+        self.record = record
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        self.record[self.name] = self.record.get(self.name, 0.0) + elapsed
+
+
+class _URLScope:
+    def __init__(self, profiler, url):
+        self.profiler = profiler
+        self.url = url
+        self.record = {}
+        self.profile = None
+
+    def __enter__(self):
+        profiler = self.profiler
+        profiler.current = self.record
+        if profiler.sample_rate and random.random() < profiler.sample_rate:
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        total = time.perf_counter() - self.start
+        if self.profile is not None:
+            self.profile.disable()
+            self.profiler._add_profile(self.profile)
+        self.profiler.current = None
+        self.profiler.records.append((self.url, total, self.record))
+
+
+class PipelineProfiler:
+    """Per-URL stage timings with optional cProfile sampling.
+
+    Wrap each URL in ``with profiler.url(url):`` and each stage in
+    ``with profiler.stage(name):``. A disabled profiler hands out a shared
+    no-op context, so the instrumented code path costs next to nothing.
+    """
+
+    def __init__(self, enabled=False, sample_rate=0.0, report_dir="logs", top_n=20):
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.report_dir = report_dir
+        self.top_n = top_n
+        self.records = []
+        self.current = None
+        self.stats = None
+
+    def url(self, url):
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return _URLScope(self, url)
+
+    def stage(self, name):
+        if self.current is None:
+            return _NULL_CONTEXT
+        return _StageTimer(self.current, name)
+
+    def _add_profile(self, profile):
+        if self.stats is None:
+            self.stats = pstats.Stats(profile)
+        else:
+            self.stats.add(profile)
+
+    def format_report(self, top_n=None):
+        """Return a text table of the ``top_n`` slowest URLs by stage."""
+        top_n = top_n or self.top_n
+        stages = list(STAGES) + sorted(
+            {name for _, _, record in self.records for name in record} - set(STAGES)
+        )
+        slowest = sorted(self.records, key=lambda item: item[1], reverse=True)[:top_n]
+
+        header = ["total"] + stages + ["url"]
+        lines = [
+            f"Slowest {len(slowest)} of {len(self.records)} URLs (seconds)",
+            "  ".join(f"{name:>13}" for name in header[:-1]) + "  url",
+        ]
+        for url, total, record in slowest:
+            values = [total] + [record.get(name, 0.0) for name in stages]
+            lines.append("  ".join(f"{value:>13.4f}" for value in values) + f"  {url}")
+
+        totals = [sum(item[1] for item in self.records)] + [
+            sum(record.get(name, 0.0) for _, _, record in self.records) for name in stages
+        ]
+        lines.append("  ".join(f"{value:>13.4f}" for value in totals) + "  (all URLs)")
+        return "\n".join(lines) + "\n"
+
+    def write_report(self, top_n=None):
+        """Write the slowest-URL report and the aggregated cProfile dump.
+
+        Returns the paths written. The ``.prof`` file loads in
+        ``python -m pstats``, snakeviz and other pstats viewers.
+        """
+        os.makedirs(self.report_dir, exist_ok=True)
+        paths = []
+
+        report_path = os.path.join(self.report_dir, "profile_slowest_urls.txt")
+        with open(report_path, 'w') as f:
+            f.write(self.format_report(top_n))
+        paths.append(report_path)
+
+        if self.stats is not None:
+            stats_path = os.path.join(self.report_dir, "profile.prof")
+            self.stats.dump_stats(stats_path)
+            paths.append(stats_path)
+        return paths
+
+
+NULL_PROFILER = PipelineProfiler(enabled=False)
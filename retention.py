@@ -0,0 +1,354 @@
+import argparse
+import gzip
+import heapq
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from rollups import catch_up_rollups
+
+DB_NAME = "darkweb_data.db"
+ARCHIVE_DIR = "data_archive"
+RETENTION_DAYS = 30
+BATCH_SIZE = 500
+VACUUM_PAGES_PER_STEP = 256
+
+PARTITION_PREFIX = "scraped_data_"
+PARTITION_SUFFIX = ".jsonl.gz"
+
+
+def _connect():
+    conn = sqlite3.connect(DB_NAME, timeout=30)
+    conn.execute("PRAGMA busy_timeout = 30000")
+    return conn
+
+
+def _partition_name(day, min_id, max_id):
+    return f"{PARTITION_PREFIX}{day}_{min_id}-{max_id}{PARTITION_SUFFIX}"
+
+
+def _legacy_partitions(archive_dir=ARCHIVE_DIR):
+    """Per-day partition files written before partitions carried id ranges."""
+    if not os.path.isdir(archive_dir):
+        return []
+    names = []
+    for name in os.listdir(archive_dir):
+        if name.startswith(PARTITION_PREFIX) and name.endswith(PARTITION_SUFFIX):
+            day = name[len(PARTITION_PREFIX):-len(PARTITION_SUFFIX)]
+            if "_" not in day:
+                names.append((name, day))
+    return sorted(names)
+
+
+def create_partition_table(cursor, archive_dir=ARCHIVE_DIR):
+    """Create the archive partition index, registering older partition files.
+
+    Each partition holds one day of one archive batch. Its id range lets
+    readers skip files that cannot contain the rows they are after.
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'archive_partitions'")
+    exists = cursor.fetchone() is not None
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS archive_partitions (
+            file TEXT PRIMARY KEY,
+            day TEXT NOT NULL,
+            min_id INTEGER NOT NULL,
+            max_id INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_archive_partitions_min_id
+        ON archive_partitions (min_id)
+    ''')
+    if exists:
+        return
+    for name, day in _legacy_partitions(archive_dir):
+        ids = []
+        for row in _read_partition(name, archive_dir):
+            ids.append(row[0])
+            cursor.executemany(
+                "INSERT OR IGNORE INTO keyword_hits (keyword, scraped_id) VALUES (?, ?)",
+                [(keyword, row[0]) for keyword in (row[2] or "").split(', ') if keyword]
+            )
+        if ids:
+            cursor.execute(
+                "INSERT OR IGNORE INTO archive_partitions (file, day, min_id, max_id) VALUES (?, ?, ?, ?)",
+                (name, day, min(ids), max(ids))
+            )
+
+
+def _fsync_dir(path):
+    if os.name == 'nt':
+        return  # directories cannot be opened for fsync on Windows
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _write_partition(path, rows):
+    """Write rows to a new partition file and make it durable.
+
+    The gzip stream is closed, trailer included, before the raw file is
+    fsynced, and the file only appears under its final name once complete.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as raw:
+        with gzip.GzipFile(fileobj=raw, mode='wb') as f:
+            for row_id, url, keywords, sentiment, snippet, scraped_at in rows:
+                f.write((json.dumps({
+                    'id': row_id,
+                    'url': url,
+                    'keywords': keywords,
+                    'sentiment': sentiment,
+                    'content_snippet': snippet,
+                    'scraped_at': scraped_at,
+                }) + "\n").encode('utf-8'))
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp_path, path)
+    _fsync_dir(os.path.dirname(path) or ".")
+
+
+def enable_incremental_vacuum():
+    """Switch an existing database to incremental auto-vacuum.
+
+    Databases created before this setting need one full VACUUM to change
+    mode, which holds the write lock while it runs. Run it once, with the
+    scrapers stopped, via ``retention.py --enable-incremental-vacuum``.
+    """
+    conn = _connect()
+    mode = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+    if mode != 2:
+        print("Switching database to incremental vacuum (one-time full VACUUM)...")
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+    conn.close()
+
+
+def archive_expired_rows(days=RETENTION_DAYS, batch_size=BATCH_SIZE, archive_dir=ARCHIVE_DIR):
+    """Move rows older than ``days`` into gzip JSON-lines partitions.
+
+    Rows are only removed after they are in the rollups and their partition
+    is durable on disk. The partition index entries and the deletes commit
+    together, one short transaction per batch, so concurrent scrapes are
+    never held up for long. keyword_hits rows are kept as the long-term
+    per-keyword record and resolve to partitions through the index.
+    Returns the number of rows moved.
+    """
+    # Rollups must include a row before its detail is dropped
+    catch_up_rollups()
+    os.makedirs(archive_dir, exist_ok=True)
+
+    conn = _connect()
+    create_partition_table(conn.cursor(), archive_dir)
+    conn.commit()
+    moved = 0
+    while True:
+        rows = conn.execute('''
+            SELECT id, url, keywords, sentiment, content_snippet, scraped_at
+            FROM scraped_data
+            WHERE scraped_at < datetime('now', ?) AND rolled_up = 1
+            ORDER BY id LIMIT ?
+        ''', (f"-{int(days)} days", batch_size)).fetchall()
+        if not rows:
+            break
+
+        by_day = {}
+        for row in rows:
+            by_day.setdefault(row[5][:10], []).append(row)
+        partitions = []
+        for day, day_rows in by_day.items():
+            name = _partition_name(day, day_rows[0][0], day_rows[-1][0])
+            _write_partition(os.path.join(archive_dir, name), day_rows)
+            partitions.append((name, day, day_rows[0][0], day_rows[-1][0]))
+
+        conn.executemany(
+            "INSERT OR REPLACE INTO archive_partitions (file, day, min_id, max_id) VALUES (?, ?, ?, ?)",
+            partitions
+        )
+        conn.executemany("DELETE FROM scraped_data WHERE id = ?", [(row[0],) for row in rows])
+        conn.commit()
+        moved += len(rows)
+    conn.close()
+    return moved
+
+
+def compact(pages_per_step=VACUUM_PAGES_PER_STEP, pause=0.05):
+    """Return free pages to the filesystem a few at a time.
+
+    Returns the number of pages released. Does nothing unless the database
+    is in incremental auto-vacuum mode (see ``enable_incremental_vacuum``).
+    """
+    conn = _connect()
+    released = 0
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        conn.close()
+        print("Skipping compaction: run 'python retention.py --enable-incremental-vacuum' once first")
+        return released
+    free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    while free:
+        # execute() would only step the pragma once, freeing a single page
+        conn.executescript(f"PRAGMA incremental_vacuum({min(free, pages_per_step)});")
+        remaining = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if remaining >= free:
+            break
+        released += free - remaining
+        free = remaining
+        # Give waiting writers a chance between steps
+        time.sleep(pause)
+    conn.close()
+    return released
+
+
+def run_retention(days=RETENTION_DAYS):
+    """Archive expired rows and compact the database file."""
+    moved = archive_expired_rows(days)
+    released = compact()
+    print(f"Retention: archived {moved} rows, released {released} pages")
+    return moved, released
+
+
+class RetentionWorker(threading.Thread):
+    """Background thread that applies the retention policy periodically."""
+
+    def __init__(self, days=RETENTION_DAYS, interval=3600):
+        super().__init__(daemon=True)
+        self.days = days
+        self.interval = interval
+        self.stop_event = threading.Event()
+
+    def run(self):
+        while not self.stop_event.is_set():
+            try:
+                run_retention(self.days)
+            except (sqlite3.Error, OSError) as e:
+                print(f"Retention error: {e}")
+            self.stop_event.wait(self.interval)
+
+    def stop(self):
+        self.stop_event.set()
+
+
+def _read_partition(name, archive_dir=ARCHIVE_DIR):
+    """Yield the rows of one partition file.
+
+    Older partitions were appended to in place, so a crash could leave a
+    truncated final gzip member; the rows before it are still returned.
+    """
+    try:
+        with gzip.open(os.path.join(archive_dir, name), 'rt', encoding='utf-8') as f:
+            for line in f:
+                record = json.loads(line)
+                yield (record['id'], record['url'], record['keywords'], record['sentiment'],
+                       record['content_snippet'], record['scraped_at'])
+    except (EOFError, gzip.BadGzipFile, zlib.error):
+        return
+
+
+def query_findings(start=None, end=None, keyword=None, since=0, limit=None,
+                   archive_dir=ARCHIVE_DIR, conn=None):
+    """Return findings between two days (YYYY-MM-DD, inclusive), oldest first.
+
+    Rows come from the live table and from any archive partitions in range,
+    in the same (id, url, keywords, sentiment, snippet, scraped_at) shape.
+    ``since`` and ``limit`` page by id: only rows with a greater id are
+    returned, at most ``limit`` of them. Partitions are only opened when
+    their id range (and, for a keyword, its keyword_hits) can contribute.
+    Pass ``conn`` to query through an existing (for example read-only)
+    connection.
+    """
+    query = '''
+        SELECT s.id, s.url, s.keywords, s.sentiment, s.content_snippet, s.scraped_at
+        FROM scraped_data s
+    '''
+    conditions, params = ["s.id > ?"], [since]
+    if keyword is not None:
+        query += " JOIN keyword_hits k ON k.scraped_id = s.id"
+        conditions.append("k.keyword = ?")
+        params.append(keyword)
+    if start:
+        conditions.append("s.scraped_at >= ?")
+        params.append(start)
+    if end:
+        conditions.append("s.scraped_at < date(?, '+1 day')")
+        params.append(end)
+    query += " WHERE " + " AND ".join(conditions) + " ORDER BY s.id"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+
+    partition_query = "SELECT file, min_id FROM archive_partitions p WHERE max_id > ?"
+    partition_params = [since]
+    if start:
+        partition_query += " AND day >= ?"
+        partition_params.append(start)
+    if end:
+        partition_query += " AND day <= ?"
+        partition_params.append(end)
+    if keyword is not None:
+        partition_query += '''
+            AND EXISTS (
+                SELECT 1 FROM keyword_hits k
+                WHERE k.keyword = ? AND k.scraped_id > ?
+                AND k.scraped_id BETWEEN p.min_id AND p.max_id
+            )
+        '''
+        partition_params += [keyword, since]
+    partition_query += " ORDER BY min_id"
+
+    if conn is not None:
+        live = conn.execute(query, params).fetchall()
+        partitions = conn.execute(partition_query, partition_params).fetchall()
+    else:
+        conn = _connect()
+        live = conn.execute(query, params).fetchall()
+        partitions = conn.execute(partition_query, partition_params).fetchall()
+        conn.close()
+
+    rows = {row[0]: row for row in live}
+    for name, min_id in partitions:
+        # Partitions come in min_id order, so once ``limit`` rows below this
+        # one's range are in hand no later partition can improve the page
+        if limit is not None and len(rows) >= limit and min_id > heapq.nsmallest(limit, rows)[-1]:
+            break
+        for row in _read_partition(name, archive_dir):
+            if row[0] > since and (keyword is None or keyword in (row[2] or "").split(', ')):
+                rows[row[0]] = row
+    return [rows[row_id] for row_id in sorted(rows)[:limit]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply the data retention policy to darkweb_data.db.")
+    parser.add_argument("--days", type=int, default=RETENTION_DAYS,
+                        help="keep detailed rows for this many days")
+    parser.add_argument("--interval", type=int, default=0,
+                        help="repeat every N seconds instead of running once")
+    parser.add_argument("--enable-incremental-vacuum", action="store_true",
+                        help="one-time switch of an existing database to incremental vacuum "
+                             "(runs a full VACUUM; stop the scrapers first) and exit")
+    args = parser.parse_args()
+
+    if args.enable_incremental_vacuum:
+        enable_incremental_vacuum()
+        return
+
+    if not args.interval:
+        run_retention(args.days)
+        return
+
+    worker = RetentionWorker(args.days, args.interval)
+    worker.start()
+    try:
+        while worker.is_alive():
+            worker.join(1)
+    except KeyboardInterrupt:
+        worker.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlparse
+
+DB_NAME = "darkweb_data.db"
+
+# Bucket formats applied to the row's UTC timestamp ("YYYY-MM-DD HH:MM:SS")
+GRANULARITIES = {
+    'hour': "%Y-%m-%d %H:00",
+    'day': "%Y-%m-%d",
+}
+
+
+def create_rollup_tables(cursor):
+    """Create the rollup tables if they don't exist."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS keyword_rollup (
+            granularity TEXT NOT NULL,
+            bucket TEXT NOT NULL,
+            host TEXT NOT NULL,
+            keyword TEXT NOT NULL,
+            hits INTEGER NOT NULL,
+            PRIMARY KEY (granularity, keyword, bucket, host)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sentiment_rollup (
+            granularity TEXT NOT NULL,
+            bucket TEXT NOT NULL,
+            host TEXT NOT NULL,
+            sentiment TEXT NOT NULL,
+            pages INTEGER NOT NULL,
+            PRIMARY KEY (granularity, bucket, host, sentiment)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_keyword_rollup_host
+        ON keyword_rollup (granularity, host, bucket)
+    ''')
+    # Serves the unfiltered "last N buckets" trend in bucket order
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_keyword_rollup_bucket
+        ON keyword_rollup (granularity, bucket, host, keyword)
+    ''')
+
+
+def host_of(url):
+    """Return the host part of a URL, tolerating scheme-less input."""
+    host = urlparse(url if "://" in url else f"http://{url}").hostname
+    return host or url
+
+
+def _parse_timestamp(scraped_at):
+    """Parse a stored UTC timestamp; missing or unreadable values count as now."""
+    if scraped_at:
+        try:
+            ts = datetime.fromisoformat(str(scraped_at))
+            if ts.tzinfo is not None:
+                ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+            return ts
+        except ValueError:
+            pass
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _buckets(scraped_at):
+    ts = _parse_timestamp(scraped_at)
+    return [(granularity, ts.strftime(fmt)) for granularity, fmt in GRANULARITIES.items()]
+
+
+def apply_rollups(cursor, url, keywords, sentiment, scraped_at):
+    """Add one scraped page to the rollups using the caller's transaction."""
+    host = host_of(url)
+    for granularity, bucket in _buckets(scraped_at):
+        for keyword in set(keywords):
+            cursor.execute('''
+                INSERT INTO keyword_rollup (granularity, bucket, host, keyword, hits)
+                VALUES (?, ?, ?, ?, 1)
+                ON CONFLICT (granularity, keyword, bucket, host) DO UPDATE SET hits = hits + 1
+            ''', (granularity, bucket, host, keyword))
+        cursor.execute('''
+            INSERT INTO sentiment_rollup (granularity, bucket, host, sentiment, pages)
+            VALUES (?, ?, ?, ?, 1)
+            ON CONFLICT (granularity, bucket, host, sentiment) DO UPDATE SET pages = pages + 1
+        ''', (granularity, bucket, host, sentiment))
+
+
+def catch_up_rollups(batch_size=1000):
+    """Fold rows that are not yet in the rollups into them.
+
+    Covers rows written before the rollup tables existed, or by writers
+    that bypass ``db_helper.insert_data``. Each row is claimed before it is
+    folded, so concurrent callers never count it twice. Returns the number
+    of rows folded.
+    """
+    conn = sqlite3.connect(DB_NAME)
+    cursor = conn.cursor()
+    # Rows inserted without a timestamp are dated when first rolled up
+    cursor.execute('''
+        UPDATE scraped_data SET scraped_at = CURRENT_TIMESTAMP
+        WHERE rolled_up = 0 AND scraped_at IS NULL
+    ''')
+    conn.commit()
+    total = 0
+    while True:
+        cursor.execute('''
+            SELECT id, url, keywords, sentiment, scraped_at FROM scraped_data
+            WHERE rolled_up = 0 ORDER BY id LIMIT ?
+        ''', (batch_size,))
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        for row_id, url, keywords, sentiment, scraped_at in rows:
+            cursor.execute(
+                "UPDATE scraped_data SET rolled_up = 1 WHERE id = ? AND rolled_up = 0", (row_id,)
+            )
+            if cursor.rowcount != 1:
+                continue  # another caller folded it since the SELECT
+            keyword_list = [kw for kw in (keywords or "").split(', ') if kw]
+            apply_rollups(cursor, url, keyword_list, sentiment, scraped_at)
+            total += 1
+        conn.commit()
+    conn.close()
+    return total
+
+
+def _since_bucket(granularity, periods):
+    now = datetime.now(timezone.utc)
+    delta = timedelta(hours=periods) if granularity == 'hour' else timedelta(days=periods)
+    return (now - delta).strftime(GRANULARITIES[granularity])
+
+
+def _fetch(query, params, conn=None):
+    """Run a trend query on ``conn``, or on a short-lived connection."""
+    if conn is not None:
+        return conn.execute(query, params).fetchall()
+    conn = sqlite3.connect(DB_NAME)
+    rows = conn.execute(query, params).fetchall()
+    conn.close()
+    return rows
+
+
+def keyword_trend(keyword=None, host=None, granularity='day', periods=90, conn=None):
+    """Return (bucket, host, keyword, hits) rows for the last ``periods`` buckets."""
+    query = '''
+        SELECT bucket, host, keyword, hits FROM keyword_rollup
+        WHERE granularity = ? AND bucket >= ?
+    '''
+    params = [granularity, _since_bucket(granularity, periods)]
+    if keyword is not None:
+        query += " AND keyword = ?"
+        params.append(keyword)
+    if host is not None:
+        query += " AND host = ?"
+        params.append(host)
+    query += " ORDER BY bucket, host, keyword"
+
+    return _fetch(query, params, conn)
+
+
+def sentiment_trend(host=None, granularity='day', periods=90, conn=None):
+    """Return (bucket, host, sentiment, pages) rows for the last ``periods`` buckets."""
+    query = '''
+        SELECT bucket, host, sentiment, pages FROM sentiment_rollup
+        WHERE granularity = ? AND bucket >= ?
+    '''
+    params = [granularity, _since_bucket(granularity, periods)]
+    if host is not None:
+        query += " AND host = ?"
+        params.append(host)
+    query += " ORDER BY bucket, host, sentiment"
+
+    return _fetch(query, params, conn)
@@ -0,0 +1,127 @@
+import re
+import time
+
+import numpy as np
+
+# Multiplier applied to a keyword according to what kind of entity it is
+ENTITY_WEIGHTS = {
+    'email': 3.0,
+    'credential': 2.5,
+    'domain': 2.0,
+    'term': 1.0,
+}
+SENTIMENT_POLARITY = {'Negative': -1.0, 'Neutral': 0.0, 'Positive': 1.0}
+# Negative pages score up to this fraction higher, positive ones lower
+SENTIMENT_WEIGHT = 0.25
+RECENCY_HALF_LIFE_DAYS = 7.0
+
+EMAIL_PATTERN = re.compile(r'^[^@\s]+@[^@\s]+\.[a-z]{2,}$', re.IGNORECASE)
+DOMAIN_PATTERN = re.compile(r'^([a-z0-9-]+\.)+[a-z]{2,}$', re.IGNORECASE)
+CREDENTIAL_WORDS = ('password', 'passwd', 'login', 'credential', 'creds', 'combo', 'dump', 'token')
+
+
+def entity_type(keyword):
+    """Classify a watchlist keyword as email, credential, domain or term."""
+    keyword = keyword.strip()
+    if EMAIL_PATTERN.match(keyword):
+        return 'email'
+    if any(word in keyword.lower() for word in CREDENTIAL_WORDS):
+        return 'credential'
+    if DOMAIN_PATTERN.match(keyword):
+        return 'domain'
+    return 'term'
+
+
+def _timestamps(values):
+    """Parse UTC timestamps ("YYYY-MM-DD HH:MM:SS" or epoch seconds) to datetime64[s]."""
+    parsed = []
+    for value in values:
+        if value is None:
+            parsed.append('NaT')
+        elif isinstance(value, (int, float)):
+            parsed.append(np.datetime64(int(value), 's'))
+        else:
+            parsed.append(value.replace(' ', 'T'))
+    return np.array(parsed, dtype='datetime64[s]')
+
+
+def score_pages(pages, keyword_weights=None, now=None):
+    """Return a NumPy array with one threat score per page.
+
+    Each page is a dict with ``keywords`` (list of detected keywords) and
+    ``sentiment`` (label), plus optional ``hit_counts`` ({keyword: count}),
+    ``similarities`` ({keyword: 0..1}) and ``scraped_at``. The score is the
+    sum over keywords of weight * entity weight * similarity * log(1 + hits),
+    scaled by sentiment polarity and an exponential recency decay.
+    """
+    keyword_weights = keyword_weights or {}
+    count = len(pages)
+    if count == 0:
+        return np.zeros(0)
+
+    # Flatten (page, keyword) hits into parallel arrays
+    vocabulary = {}
+    page_ids, keyword_ids, hits, similarity = [], [], [], []
+    for page_id, page in enumerate(pages):
+        hit_counts = page.get('hit_counts') or {}
+        similarities = page.get('similarities') or {}
+        for keyword in page['keywords']:
+            page_ids.append(page_id)
+            keyword_ids.append(vocabulary.setdefault(keyword, len(vocabulary)))
+            hits.append(hit_counts.get(keyword, 1))
+            similarity.append(similarities.get(keyword, 1.0))
+
+    weights = np.array([
+        keyword_weights.get(keyword, 1.0) * ENTITY_WEIGHTS[entity_type(keyword)]
+        for keyword in vocabulary
+    ], dtype=float)
+    contributions = (
+        weights[np.array(keyword_ids, dtype=np.intp)]
+        * np.array(similarity, dtype=float)
+        * np.log1p(np.array(hits, dtype=float))
+    )
+    keyword_score = np.bincount(
+        np.array(page_ids, dtype=np.intp), weights=contributions, minlength=count
+    )
+
+    polarity = np.array([SENTIMENT_POLARITY.get(page.get('sentiment'), 0.0) for page in pages])
+    sentiment_factor = 1.0 - SENTIMENT_WEIGHT * polarity
+
+    now = np.datetime64(int(now if now is not None else time.time()), 's')
+    scraped_at = _timestamps([page.get('scraped_at') for page in pages])
+    age = (now - scraped_at).astype('timedelta64[s]')
+    # Pages without a timestamp count as fresh
+    age_days = np.where(np.isnat(age), 0.0, age.astype(float) / 86400.0)
+    age_days = np.clip(age_days, 0.0, None)
+    recency = np.exp2(-age_days / RECENCY_HALF_LIFE_DAYS)
+
+    return keyword_score * sentiment_factor * recency
+
+
+def top_k(scores, k=None):
+    """Indices of the ``k`` highest scores, best first (all when k is None)."""
+    if k is None or k >= len(scores):
+        return np.argsort(-scores, kind='stable')
+    if k <= 0:
+        return np.zeros(0, dtype=np.intp)
+    best = np.argpartition(-scores, k - 1)[:k]
+    return best[np.argsort(-scores[best], kind='stable')]
+
+
+def rank_results(results, k=None, keyword_weights=None):
+    """Score result dicts in place and return them best first."""
+    scores = score_pages(results, keyword_weights)
+    for result, score in zip(results, scores):
+        result['score'] = round(float(score), 3)
+    return [results[i] for i in top_k(scores, k)]
+
+
+def rank_rows(rows, k=None, keyword_weights=None):
+    """Rank ``scraped_data`` rows; returns (score, row) pairs, best first."""
+    pages = [{
+        'keywords': [kw for kw in (row[2] or "").split(', ') if kw],
+        'sentiment': row[3],
+        'scraped_at': row[5] if len(row) > 5 else None,
+    } for row in rows]
+    scores = score_pages(pages, keyword_weights)
+    return [(float(scores[i]), rows[i]) for i in top_k(scores, k)]
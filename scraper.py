@@ -1,10 +1,124 @@
+import codecs
+import re
+import threading
+from urllib.parse import urlparse
 from bs4 import BeautifulSoup
+from charset_normalizer import from_bytes
+from profiling import NULL_PROFILER
 
-def scrape_onion_site(url, session):
+# Bytes searched for a <meta charset> declaration
+SNIFF_BYTES = 4096
+# Bytes handed to statistical detection when nothing is declared
+DETECT_BYTES = 64 * 1024
+HOST_CACHE_SIZE = 1024
+
+HEADER_CHARSET = re.compile(r'charset\s*=\s*["\']?\s*([\w.:-]+)', re.IGNORECASE)
+META_CHARSET = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([\w.:-]+)', re.IGNORECASE)
+NON_ASCII = re.compile(rb'[\x80-\xff]')
+BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+_host_encodings = {}
+_host_lock = threading.Lock()
+
+def _codec(name):
+    """Return the canonical codec name, or None if Python doesn't know it."""
+    try:
+        return codecs.lookup(name.decode('ascii') if isinstance(name, bytes) else name).name
+    except (LookupError, UnicodeDecodeError):
+        return None
+
+def _is_utf8(prefix):
+    """True if prefix is valid UTF-8, allowing a character cut off at the end."""
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(prefix, final=False)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+def _remember(host, encoding):
+    with _host_lock:
+        if host not in _host_encodings and len(_host_encodings) >= HOST_CACHE_SIZE:
+            _host_encodings.pop(next(iter(_host_encodings)))
+        _host_encodings[host] = encoding
+
+def detect_encoding(content, content_type=None, host=None):
+    """Pick the encoding for a response body without scanning all of it.
+
+    Checked in order: the Content-Type charset, a byte-order mark, a
+    <meta charset> in the first few KB, a UTF-8 validity check, the
+    encoding last detected for the same host, then detection over a
+    bounded sample of the body.
+    """
+    if content_type:
+        match = HEADER_CHARSET.search(content_type)
+        if match and _codec(match.group(1)):
+            return _codec(match.group(1))
+
+    for bom, encoding in BOMS:
+        if content.startswith(bom):
+            return encoding
+
+    match = META_CHARSET.search(content[:SNIFF_BYTES])
+    if match and _codec(match.group(1)):
+        return _codec(match.group(1))
+
+    # An all-ASCII head says nothing about the encoding; sample from the
+    # first non-ASCII byte instead
+    sample = content[:DETECT_BYTES]
+    if sample.isascii():
+        match = NON_ASCII.search(content, DETECT_BYTES)
+        if match is None:
+            return 'utf-8'
+        sample = content[match.start():match.start() + DETECT_BYTES]
+    if _is_utf8(sample):
+        return 'utf-8'
+
+    if host is not None:
+        with _host_lock:
+            cached = _host_encodings.get(host)
+        if cached:
+            return cached
+
+    best = from_bytes(sample).best()
+    encoding = (_codec(best.encoding) if best else None) or 'utf-8'
+    if host is not None:
+        _remember(host, encoding)
+    return encoding
+
+def fetch_page(url, session):
+    """Fetch a page over the Tor session."""
+    return session.get(url, timeout=10)
+
+def decode_page(response):
+    """Decode the response body to text.
+
+    Uses ``detect_encoding`` rather than ``response.text``, which either
+    assumes ISO-8859-1 for text/* without a charset or runs detection over
+    the whole body when there is no Content-Type at all.
+    """
+    host = urlparse(response.url).hostname if response.url else None
+    encoding = detect_encoding(response.content, response.headers.get('Content-Type'), host)
+    return response.content.decode(encoding, errors='replace')
+
+def parse_page(text):
+    """Parse decoded HTML into a BeautifulSoup tree."""
+    return BeautifulSoup(text, 'html.parser')
+
+def scrape_onion_site(url, session, profiler=NULL_PROFILER):
     """Scrape the content of an onion site using a Tor session."""
     try:
-        response = session.get(url, timeout=10)
-        soup = BeautifulSoup(response.text, 'html.parser')
+        with profiler.stage('fetch'):
+            response = fetch_page(url, session)
+        with profiler.stage('decode'):
+            text = decode_page(response)
+        with profiler.stage('parse'):
+            soup = parse_page(text)
         return soup
     except Exception as e:
         print(f"Error accessing {url}: {e}")